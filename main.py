@@ -5,8 +5,21 @@ import sys
 import shutil
 import argparse
 import logging
+import re
+import threading
+import queue
+import itertools
+import time
+import uuid
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import urllib.request
+import http.client
+import tempfile
+import select
+from typing import List, Dict, Any, Tuple, Optional, BinaryIO, Union, Callable
+from concurrent.futures import ProcessPoolExecutor
 
 # --- Configuration Loading ---
 CONFIG_FILE = Path("config.json")
@@ -34,8 +47,31 @@ DEFAULT_CONFIG = {
         "max_workers": 5,
         "worker_url": "",
         "base_archive_url": "https://archive.org/download/{identifier}"
+    },
+    "validation": {
+        "max_workers": 0, # 0 means one worker per CPU
+        "duration_tolerance": 0.25 # Seconds of drift allowed between playlists and PTS
+    },
+    "streaming": {
+        "probe_bytes": 16 * 1024 * 1024, # Prefix of a streamed input buffered for ffprobe
+        "chunk_size": 1024 * 1024,
+        "spill_dir": "", # Where inputs that need seeking are spilled; empty means the system temp directory
+        "timeout": 30 # Seconds without data before an HTTP(S) input is considered stalled
+    },
+    "daemon": {
+        "host": "127.0.0.1",
+        "port": 8765,
+        "max_concurrent_jobs": 1,
+        "inbox_dir": "", # Empty disables the watch folder
+        "output_root": "hls_output",
+        "poll_interval": 2,
+        "max_finished_jobs": 1000, # Older finished jobs (and their events) are forgotten
+        "finished_job_ttl": 86400, # Seconds a finished job stays queryable
+        "inbox_extensions": [".mp4", ".mkv", ".mov", ".avi", ".webm", ".ts", ".m4v"]
     }
 }
+# Sections merged key by key, so a config.json may override single properties of them
+MERGED_CONFIG_SECTIONS = ("validation", "streaming", "daemon")
 
 
 def load_config() -> Dict[str, Any]:
@@ -45,7 +81,11 @@ def load_config() -> Dict[str, Any]:
             with open(CONFIG_FILE, "r") as f:
                 config = json.load(f)
             # Basic validation or merging with defaults could be added here
-            return {**DEFAULT_CONFIG, **config}
+            merged = {**DEFAULT_CONFIG, **config}
+            for section in MERGED_CONFIG_SECTIONS:
+                if isinstance(config.get(section), dict):
+                    merged[section] = {**DEFAULT_CONFIG[section], **config[section]}
+            return merged
         except json.JSONDecodeError:
             logging.error(f"Error decoding {CONFIG_FILE}. Using default configuration.")
             return DEFAULT_CONFIG
@@ -56,6 +96,8 @@ def load_config() -> Dict[str, Any]:
 
 APP_CONFIG = load_config()
 VIDEO_VARIANTS = APP_CONFIG["video_variants"]
+# Subtitle codecs FFmpeg can convert to WebVTT; bitmap subtitles (PGS, DVB, VobSub) are skipped
+TEXT_SUBTITLE_CODECS = {"subrip", "srt", "ass", "ssa", "webvtt", "mov_text", "text"}
 
 # --- Logging Setup ---
 logging.basicConfig(
@@ -65,11 +107,136 @@ logging.basicConfig(
 )
 
 # --- Helper Functions ---
-def run_command(cmd: List[str], check: bool = True) -> subprocess.CompletedProcess:
-    """Executes a shell command and logs its execution."""
+JOB_CONTEXT = threading.local()
+
+class JobCancelled(BaseException):
+    """Raised inside a daemon job once it has been cancelled.
+
+    Derived from BaseException so the `except Exception` fallbacks in the packaging steps don't swallow it.
+    """
+
+class InputStreamError(Exception):
+    """Raised when reading a streamed input fails partway through."""
+
+def raise_if_cancelled():
+    """Raises JobCancelled if the daemon job running on this thread has been cancelled."""
+    job = getattr(JOB_CONTEXT, "job", None) # Set by daemon workers so running jobs can be cancelled
+    if job is not None and job["cancel_requested"]:
+        raise JobCancelled(f"Job {job['id']} was cancelled")
+
+def read_progress(stdout_pipe, stdout_lines: List[bytes], report: Callable[..., None], duration: Optional[float]):
+    """Parses FFmpeg `-progress pipe:1` output and reports out_time (and percent of `duration`) per update."""
+    out_time = None
+    for line in iter(stdout_pipe.readline, b""):
+        stdout_lines.append(line)
+        key, _, value = line.decode("utf-8", errors="replace").strip().partition("=")
+        if key == "out_time_us" and value.isdigit():
+            out_time = int(value) / 1_000_000
+        elif key == "progress" and out_time is not None:
+            percent = round(min(100.0, out_time / duration * 100), 1) if duration else None
+            report(out_time=round(out_time, 3), percent=percent)
+
+def read_stream_chunk(stream: BinaryIO, size: int) -> bytes:
+    """Reads whatever is available (up to `size` bytes) so cancellation is checked between small reads.
+
+    Raises http.client.IncompleteRead if an HTTP body ends before its Content-Length.
+    """
+    chunk = stream.read1(size) if hasattr(stream, "read1") else stream.read(size)
+    if not chunk and getattr(stream, "length", None): # HTTPResponse counts down the unread Content-Length
+        raise http.client.IncompleteRead(b"", stream.length)
+    return chunk
+
+def feed_process_stdin(process: subprocess.Popen, stdin_pipe, prefix: bytes, stream: Optional[BinaryIO], feed_state: Dict[str, Any]):
+    """Writes `prefix` and then the rest of `stream` into a process's stdin.
+
+    If reading `stream` fails, the error is stored in `feed_state["error"]` and the process is killed, so a
+    truncated input is never mistaken for a normal end of input.
+    """
+    chunk_size = APP_CONFIG["streaming"]["chunk_size"]
+    try:
+        stdin_pipe.write(prefix)
+        while stream is not None:
+            try:
+                chunk = read_stream_chunk(stream, chunk_size)
+            except Exception as e: # OSError, socket timeouts, http.client.IncompleteRead, ...
+                feed_state["error"] = e
+                process.kill()
+                break
+            if not chunk:
+                break
+            stdin_pipe.write(chunk)
+    except (BrokenPipeError, ValueError): # The process stopped reading (ffprobe exits early, or it failed)
+        pass
+    except OSError as e:
+        logging.error(f"Error while writing to process stdin: {e}")
+    finally:
+        try:
+            stdin_pipe.close()
+        except OSError:
+            pass
+
+def run_command(
+    cmd: List[str],
+    check: bool = True,
+    stdin_data: Optional[bytes] = None,
+    stdin_stream: Optional[BinaryIO] = None
+) -> subprocess.CompletedProcess:
+    """Executes a shell command and logs its execution.
+
+    If `stdin_data` is given it is written to the command's stdin, followed by everything read from `stdin_stream`.
+    Raises InputStreamError if reading `stdin_stream` fails.
+    """
+    job = getattr(JOB_CONTEXT, "job", None)
+    report_progress = getattr(JOB_CONTEXT, "report_progress", None)
+    if report_progress is not None and cmd[0] == APP_CONFIG["ffmpeg_path"]:
+        cmd = [cmd[0], "-progress", "pipe:1", "-nostats"] + cmd[1:]
     logging.info(f"Executing: {' '.join(cmd)}")
+    raise_if_cancelled()
     try:
-        result = subprocess.run(cmd, check=check, capture_output=True, text=True)
+        process = subprocess.Popen(
+            cmd,
+            # Never let FFmpeg read the terminal; concurrent daemon jobs would steal tty input or stop on SIGTTIN
+            stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        if job is not None:
+            job["process"] = process
+            if job["cancel_requested"]: # Cancelled while the process was starting
+                process.terminate()
+        feeder = None
+        feed_state: Dict[str, Any] = {"error": None}
+        if stdin_data is not None:
+            # Feed stdin from a thread; communicate() then only drains stdout/stderr
+            feeder = threading.Thread(
+                target=feed_process_stdin, args=(process, process.stdin, stdin_data, stdin_stream, feed_state), daemon=True
+            )
+            process.stdin = None
+            feeder.start()
+        progress_reader = None
+        stdout_lines: List[bytes] = []
+        if "-progress" in cmd:
+            # Parse progress from a thread; communicate() then only drains stderr
+            progress_reader = threading.Thread(
+                target=read_progress, args=(process.stdout, stdout_lines, report_progress, job.get("duration")), daemon=True
+            )
+            process.stdout = None
+            progress_reader.start()
+        try:
+            stdout, stderr = process.communicate()
+        finally:
+            if job is not None:
+                job["process"] = None
+        if progress_reader is not None:
+            progress_reader.join()
+            stdout = b"".join(stdout_lines)
+        raise_if_cancelled() # Don't wait on a feeder that may be stuck reading a stalled source
+        if feeder is not None:
+            feeder.join()
+        if feed_state["error"] is not None:
+            raise InputStreamError(f"Reading the input stream failed: {feed_state['error']!r}")
+        stdout = stdout.decode("utf-8", errors="replace")
+        stderr = stderr.decode("utf-8", errors="replace")
+        result = subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
         if result.stdout:
             logging.debug(f"Stdout: {result.stdout.strip()}")
         if result.stderr:
@@ -82,22 +249,27 @@ def run_command(cmd: List[str], check: bool = True) -> subprocess.CompletedProce
     except FileNotFoundError:
         logging.error(f"Error: The command '{cmd[0]}' was not found. Ensure FFmpeg/FFprobe is installed and in your PATH, or configure the path in {CONFIG_FILE}.")
         sys.exit(1)
+    except (subprocess.CalledProcessError, InputStreamError):
+        raise
     except Exception as e:
         logging.error(f"An unexpected error occurred while running command {' '.join(cmd)}: {e}")
         raise
 
-def get_video_metadata(input_file: Path) -> Dict[str, Any]:
-    """Probes video file for stream information using ffprobe."""
-    logging.info(f"Probing video metadata for: {input_file}")
+def get_video_metadata(input_file: Path, prefix: Optional[bytes] = None) -> Dict[str, Any]:
+    """Probes video file for stream information using ffprobe.
+
+    When `prefix` is given, only those bytes of a streamed input are probed through stdin.
+    """
+    logging.info(f"Probing video metadata for: {input_file}" + (f" (first {len(prefix)} bytes)" if prefix is not None else ""))
     cmd = [
         APP_CONFIG["ffprobe_path"],
         "-v", "error",
         "-print_format", "json",
         "-show_streams",
         "-show_format",
-        str(input_file)
+        "pipe:0" if prefix is not None else str(input_file)
     ]
-    result = run_command(cmd)
+    result = run_command(cmd, stdin_data=prefix)
     try:
         return json.loads(result.stdout)
     except json.JSONDecodeError as e:
@@ -124,17 +296,167 @@ def get_input_video_resolution(streams: List[Dict[str, Any]]) -> Optional[Tuple[
                 return int(width), int(height)
     return None
 
-# --- Core HLS Generation Logic ---
-def generate_video_renditions(
-    input_file: Path,
+# --- Streaming Input ---
+
+class FifoStream:
+    """Non-blocking reader for a named pipe.
+
+    A plain open() blocks until a writer connects and a blocked read() can't be interrupted, so a stalled
+    pipe would hang a daemon worker. Reads here wait in short select() slices, check for cancellation and
+    raise TimeoutError after `streaming.timeout` seconds without data. close() waits for the current slice.
+    """
+
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, path: str, timeout: float):
+        self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK) # Doesn't wait for a writer
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def read1(self, size: int) -> bytes:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            raise_if_cancelled()
+            with self.lock:
+                if self.closed:
+                    raise ValueError("read from closed named pipe")
+                ready, _, _ = select.select([self.fd], [], [], self.POLL_INTERVAL)
+                if ready:
+                    try:
+                        return os.read(self.fd, size) # b"" once the writer has closed its end
+                    except BlockingIOError: # Spurious wakeup
+                        pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No data from named pipe for {self.timeout} seconds")
+
+    read = read1
+
+    def close(self):
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                os.close(self.fd)
+
+def open_input_stream(source: str) -> Optional[BinaryIO]:
+    """Opens stdin ("-"), an HTTP(S) URL or a named pipe for single-pass reading.
+
+    Returns None for regular files, which are read from disk as usual.
+    """
+    if source == "-":
+        return sys.stdin.buffer
+    if source.startswith(("http://", "https://")):
+        return urllib.request.urlopen(source, timeout=APP_CONFIG["streaming"]["timeout"])
+    if Path(source).is_fifo():
+        return FifoStream(source, APP_CONFIG["streaming"]["timeout"])
+    return None
+
+def input_stem(source: str) -> str:
+    """Base name used for output files derived from the input (e.g. the thumbnail)."""
+    if source == "-":
+        return "stdin"
+    if source.startswith(("http://", "https://")):
+        return Path(urlparse(source).path).stem or "stream"
+    return Path(source).stem
+
+def read_prefix(stream: BinaryIO, size: int) -> bytes:
+    """Reads up to `size` bytes, stopping early only at end of stream."""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        raise_if_cancelled()
+        chunk = read_stream_chunk(stream, min(remaining, APP_CONFIG["streaming"]["chunk_size"]))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+def spill_input_to_disk(prefix: bytes, stream: BinaryIO, spill_dir: Path, suffix: str) -> Path:
+    """Writes a streamed input to a temporary file for consumers that need to seek."""
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=spill_dir, prefix=".v2hls_spill_", suffix=suffix, delete=False) as f:
+        try:
+            f.write(prefix)
+            while True:
+                raise_if_cancelled()
+                chunk = read_stream_chunk(stream, APP_CONFIG["streaming"]["chunk_size"])
+                if not chunk:
+                    break
+                f.write(chunk)
+        except BaseException: # Includes JobCancelled; don't leave a partial spill behind
+            f.close()
+            Path(f.name).unlink()
+            raise
+    return Path(f.name)
+
+def generate_renditions_from_stream(
+    prefix: bytes,
+    stream: BinaryIO,
     output_dir: Path,
     segment_duration: int,
     ffmpeg_preset: str,
     selected_qualities: List[str],
-    input_video_height: Optional[int]
-) -> List[Tuple[str, Dict[str, str], str]]:
-    """Generates different video quality renditions."""
+    input_video_height: Optional[int],
+    audio_streams: List[Dict[str, Any]],
+    subtitle_streams: List[Dict[str, Any]],
+    thumbnail_file: Optional[Path],
+    thumbnail_time: str
+) -> Tuple[List[Tuple[str, Dict[str, str], str]], List[Tuple[str, str, str]], List[Tuple[str, str, str]]]:
+    """Generates all renditions (and the thumbnail) with one FFmpeg process that reads the input once from stdin."""
+    cmd = [APP_CONFIG["ffmpeg_path"], "-y", "-i", "pipe:0"]
     video_paths = []
+    audio_playlists = []
+    subtitle_playlists = []
+
+    for quality_name, settings in select_video_variants(selected_qualities, input_video_height):
+        logging.info(f"Adding video rendition to pipeline: {quality_name}")
+        variant_path = output_dir / f"video_{quality_name}"
+        variant_path.mkdir(parents=True, exist_ok=True)
+        cmd += video_rendition_args(variant_path, settings, segment_duration, ffmpeg_preset)
+        video_paths.append((quality_name, settings, f"video_{quality_name}/index.m3u8"))
+    if not video_paths:
+        return [], [], []
+
+    for i, audio_stream in enumerate(audio_streams):
+        lang_code = audio_stream.get("tags", {}).get("language", f"und{i}")
+        lang_name = audio_stream.get("tags", {}).get("title", f"Audio Track {i+1}")
+        logging.info(f"Adding audio rendition to pipeline: {lang_name} ({lang_code})")
+        audio_dir = output_dir / f"audio_{lang_code}_{i}"
+        audio_dir.mkdir(parents=True, exist_ok=True)
+        cmd += audio_rendition_args(i, audio_dir, segment_duration, ffmpeg_preset)
+        audio_playlists.append((lang_code, lang_name, f"audio_{lang_code}_{i}/index.m3u8"))
+
+    for i, subtitle_stream in enumerate(subtitle_streams):
+        lang_code = subtitle_stream.get("tags", {}).get("language", f"sub{i}")
+        lang_name = subtitle_stream.get("tags", {}).get("title", f"Subtitle {i+1}")
+        # A failed output would fail the whole pipeline
+        if subtitle_stream.get("codec_name") not in TEXT_SUBTITLE_CODECS:
+            logging.warning(f"Skipping subtitle stream {i} ({lang_name}): {subtitle_stream.get('codec_name')} cannot be converted to WebVTT.")
+            continue
+        logging.info(f"Adding subtitle to pipeline: {lang_name} ({lang_code})")
+        subtitle_dir = output_dir / f"sub_{lang_code}_{i}"
+        subtitle_dir.mkdir(parents=True, exist_ok=True)
+        vtt_filename = f"subtitles_{lang_code}_{i}.vtt"
+        cmd += subtitle_rendition_args(i, subtitle_dir / vtt_filename)
+        subtitle_playlists.append((lang_code, lang_name, str(Path(f"sub_{lang_code}_{i}") / vtt_filename)))
+
+    if thumbnail_file is not None:
+        # Output-side -ss decodes up to the timestamp instead of seeking the input
+        cmd += ["-map", "0:v:0", "-ss", thumbnail_time, "-frames:v", "1", "-q:v", "2", str(thumbnail_file)]
+
+    run_command(cmd, stdin_data=prefix, stdin_stream=stream)
+    if thumbnail_file is not None:
+        logging.info(f"Thumbnail generated: {thumbnail_file}")
+    return video_paths, audio_playlists, subtitle_playlists
+
+# --- Core HLS Generation Logic ---
+def select_video_variants(
+    selected_qualities: List[str],
+    input_video_height: Optional[int]
+) -> List[Tuple[str, Dict[str, str]]]:
+    """Returns the selected video variants in configured order, skipping upscales."""
+    variants = []
     sorted_variants = sorted(VIDEO_VARIANTS.items(), key=lambda item: item[1].get('order', 0))
 
     for quality_name, settings in sorted_variants:
@@ -146,29 +468,70 @@ def generate_video_renditions(
         if input_video_height and rendition_height > input_video_height:
             logging.info(f"Skipping {quality_name} ({rendition_height}p) as it's higher than input video height ({input_video_height}p).")
             continue
-        
+        variants.append((quality_name, settings))
+    return variants
+
+def video_rendition_args(variant_path: Path, settings: Dict[str, str], segment_duration: int, ffmpeg_preset: str) -> List[str]:
+    """FFmpeg output options for one video rendition."""
+    return [
+        "-an",
+        "-map", "0:v:0",  # Map the first video stream
+        "-c:v", "libx264",
+        "-b:v", settings["bitrate"],
+        "-s", settings["resolution"],
+        "-profile:v", "main", # Or high, baseline. Main is widely compatible.
+        "-level:v", "4.0", # Adjust based on resolution/bitrate for compatibility
+        "-preset", ffmpeg_preset,
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment_duration})",
+        "-f", "hls",
+        "-hls_time", str(segment_duration),
+        "-hls_playlist_type", "vod", # Video on Demand
+        "-hls_segment_filename", str(variant_path / "segment_%05d.ts"), # %05d for more segments
+        str(variant_path / "index.m3u8")
+    ]
+
+def audio_rendition_args(index: int, audio_dir: Path, segment_duration: int, ffmpeg_preset: str) -> List[str]:
+    """FFmpeg output options for one audio rendition."""
+    return [
+        "-map", f"0:a:{index}", # Map specific audio stream
+        "-c:a", "aac",
+        "-b:a", APP_CONFIG["default_audio_bitrate"],
+        "-preset", ffmpeg_preset,
+        "-f", "hls",
+        "-hls_time", str(segment_duration),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", str(audio_dir / "segment_%05d.ts"),
+        str(audio_dir / "index.m3u8")
+    ]
+
+def subtitle_rendition_args(index: int, vtt_file_path: Path) -> List[str]:
+    """FFmpeg output options for one WebVTT subtitle track."""
+    return [
+        "-map", f"0:s:{index}", # Map specific subtitle stream
+        "-c:s", "webvtt", # Convert to WebVTT
+        str(vtt_file_path)
+    ]
+
+def generate_video_renditions(
+    input_file: Path,
+    output_dir: Path,
+    segment_duration: int,
+    ffmpeg_preset: str,
+    selected_qualities: List[str],
+    input_video_height: Optional[int]
+) -> List[Tuple[str, Dict[str, str], str]]:
+    """Generates different video quality renditions."""
+    video_paths = []
+
+    for quality_name, settings in select_video_variants(selected_qualities, input_video_height):
         logging.info(f"Processing video rendition: {quality_name}")
         variant_path = output_dir / f"video_{quality_name}"
         variant_path.mkdir(parents=True, exist_ok=True)
 
         cmd = [
             APP_CONFIG["ffmpeg_path"], "-y", # -y to overwrite output files without asking
-            "-i", str(input_file),
-            "-an"
-            "-map", "0:v:0",  # Map the first video stream
-            "-c:v", "libx264",
-            "-b:v", settings["bitrate"],
-            "-s", settings["resolution"],
-            "-profile:v", "main", # Or high, baseline. Main is widely compatible.
-            "-level:v", "4.0", # Adjust based on resolution/bitrate for compatibility
-            "-preset", ffmpeg_preset,
-            "-force_key_frames", f"expr:gte(t,n_forced*{segment_duration})",
-            "-f", "hls",
-            "-hls_time", str(segment_duration),
-            "-hls_playlist_type", "vod", # Video on Demand
-            "-hls_segment_filename", str(variant_path / "segment_%05d.ts"), # %05d for more segments
-            str(variant_path / "index.m3u8")
-        ]
+            "-i", str(input_file)
+        ] + video_rendition_args(variant_path, settings, segment_duration, ffmpeg_preset)
         run_command(cmd)
         video_paths.append((quality_name, settings, f"video_{quality_name}/index.m3u8"))
     
@@ -199,17 +562,8 @@ def generate_audio_renditions(
 
         cmd = [
             APP_CONFIG["ffmpeg_path"], "-y",
-            "-i", str(input_file),
-            "-map", f"0:a:{i}", # Map specific audio stream
-            "-c:a", "aac",
-            "-b:a", APP_CONFIG["default_audio_bitrate"],
-            "-preset", ffmpeg_preset,
-            "-f", "hls",
-            "-hls_time", str(segment_duration),
-            "-hls_playlist_type", "vod",
-            "-hls_segment_filename", str(audio_dir / "segment_%05d.ts"),
-            str(audio_dir / "index.m3u8")
-        ]
+            "-i", str(input_file)
+        ] + audio_rendition_args(i, audio_dir, segment_duration, ffmpeg_preset)
         run_command(cmd)
         audio_playlists.append((lang_code, lang_name, f"audio_{lang_code}_{i}/index.m3u8"))
     return audio_playlists
@@ -228,6 +582,9 @@ def generate_subtitle_renditions(
     for i, stream in enumerate(subtitle_streams):
         lang_code = stream.get("tags", {}).get("language", f"sub{i}")
         lang_name = stream.get("tags", {}).get("title", f"Subtitle {i+1}")
+        if stream.get("codec_name") not in TEXT_SUBTITLE_CODECS:
+            logging.warning(f"Skipping subtitle stream {i} ({lang_name}): {stream.get('codec_name')} cannot be converted to WebVTT.")
+            continue
         
         logging.info(f"Processing subtitle: {lang_name} ({lang_code})")
         subtitle_dir = output_dir / f"sub_{lang_code}_{i}"
@@ -239,11 +596,8 @@ def generate_subtitle_renditions(
         
         cmd = [
             APP_CONFIG["ffmpeg_path"], "-y",
-            "-i", str(input_file),
-            "-map", f"0:s:{i}", # Map specific subtitle stream
-            "-c:s", "webvtt", # Convert to WebVTT
-            str(vtt_file_path)
-        ]
+            "-i", str(input_file)
+        ] + subtitle_rendition_args(i, vtt_file_path)
         try:
             run_command(cmd)
             # Relative path for the master playlist
@@ -327,10 +681,15 @@ def generate_master_playlist(
             
     logging.info("Master playlist generated successfully.")
 
-def generate_thumbnail(input_file: Path, output_dir: Path, thumbnail_time: str = "00:00:05") -> Optional[Path]:
+def generate_thumbnail(
+    input_file: Path,
+    output_dir: Path,
+    thumbnail_time: str = "00:00:05",
+    thumbnail_stem: Optional[str] = None
+) -> Optional[Path]:
     """Generates a thumbnail from the video."""
     logging.info(f"Generating thumbnail for {input_file}")
-    thumbnail_file = output_dir / f"{input_file.stem}_thumbnail.jpg"
+    thumbnail_file = output_dir / f"{thumbnail_stem or input_file.stem}_thumbnail.jpg"
     try:
         cmd = [
             APP_CONFIG["ffmpeg_path"], "-y",
@@ -347,6 +706,362 @@ def generate_thumbnail(input_file: Path, output_dir: Path, thumbnail_time: str =
         logging.error(f"Failed to generate thumbnail: {e}")
         return None
 
+# --- Output Validation ---
+TS_PACKET_SIZE = 188
+TS_SYNC_BYTE = 0x47
+TS_HEAD_PACKETS = 256 # Only the head of each segment is read; PAT/PMT/first PES live there
+PTS_CLOCK = 90000
+PTS_WRAP = 1 << 33
+VIDEO_STREAM_TYPES = {0x1B: "h264", 0x24: "hevc"}
+AUDIO_STREAM_TYPES = {0x03, 0x04, 0x0F, 0x11, 0x81}
+
+def parse_master_playlist(master_path: Path) -> Dict[str, List[str]]:
+    """Collects the video, audio and subtitle URIs referenced by a master playlist."""
+    entries: Dict[str, List[str]] = {"video": [], "audio": [], "subtitles": []}
+    expect_variant_uri = False
+    with open(master_path, "r") as f:
+        for raw_line in f:
+            line = raw_line.strip()
+            if not line:
+                continue
+            if line.startswith("#EXT-X-STREAM-INF"):
+                expect_variant_uri = True
+            elif line.startswith("#EXT-X-MEDIA:"):
+                media_type = re.search(r'TYPE=([A-Z-]+)', line)
+                uri = re.search(r'URI="([^"]+)"', line)
+                if media_type and uri:
+                    if media_type.group(1) == "AUDIO":
+                        entries["audio"].append(uri.group(1))
+                    elif media_type.group(1) == "SUBTITLES":
+                        entries["subtitles"].append(uri.group(1))
+            elif not line.startswith("#") and expect_variant_uri:
+                entries["video"].append(line)
+                expect_variant_uri = False
+    return entries
+
+def parse_media_playlist(playlist_path: Path) -> Dict[str, Any]:
+    """Parses a media playlist into its target duration, segments and ENDLIST flag.
+
+    Malformed tags are reported in "errors"; a segment with an unparsable #EXTINF gets a duration of None.
+    """
+    target_duration = None
+    segments = []
+    endlist = False
+    errors = []
+    pending_duration = None
+    with open(playlist_path, "r") as f:
+        for raw_line in f:
+            line = raw_line.strip()
+            if not line:
+                continue
+            if line.startswith("#EXT-X-TARGETDURATION:"):
+                try:
+                    target_duration = int(line.split(":", 1)[1])
+                except ValueError:
+                    errors.append(f"invalid {line} (must be an integer)")
+            elif line.startswith("#EXTINF:"):
+                try:
+                    pending_duration = float(line.split(":", 1)[1].split(",", 1)[0])
+                except ValueError:
+                    pending_duration = None
+            elif line.startswith("#EXT-X-ENDLIST"):
+                endlist = True
+            elif not line.startswith("#"):
+                segments.append((line, pending_duration))
+                pending_duration = None
+    return {"target_duration": target_duration, "segments": segments, "endlist": endlist, "errors": errors}
+
+def parse_pes_pts(payload: bytes) -> Optional[int]:
+    """Returns the PTS from the start of a PES packet, if one is present."""
+    if len(payload) < 14 or payload[0:3] != b"\x00\x00\x01" or not payload[7] & 0x80:
+        return None
+    p = payload[9:14]
+    return (
+        ((p[0] >> 1) & 0x07) << 30 | p[1] << 22 | (p[2] >> 1) << 15 | p[3] << 7 | p[4] >> 1
+    )
+
+def first_vcl_is_keyframe(es_data: bytes, codec: str) -> Optional[bool]:
+    """Checks whether the first coded slice of an H.264/HEVC access unit is a random access point."""
+    pos = es_data.find(b"\x00\x00\x01")
+    while pos != -1 and pos + 3 < len(es_data):
+        header = es_data[pos + 3]
+        if codec == "h264":
+            nal_type = header & 0x1F
+            if 1 <= nal_type <= 5:
+                return nal_type == 5
+        else:
+            nal_type = (header >> 1) & 0x3F
+            if nal_type <= 31:
+                return 16 <= nal_type <= 23
+        pos = es_data.find(b"\x00\x00\x01", pos + 3)
+    return None
+
+def psi_section(payload: bytes, table_id: int, min_length: int) -> Optional[bytes]:
+    """Returns the PSI section at the start of a payload, or None if it is malformed or runs past the packet."""
+    pointer = payload[0]
+    section = payload[1 + pointer:]
+    if len(section) < 3 or section[0] != table_id:
+        return None
+    section_length = ((section[1] & 0x0F) << 8) | section[2]
+    if 3 + section_length > len(section) or 3 + section_length < min_length:
+        return None
+    return section[:3 + section_length]
+
+def scan_ts_segment(segment_path: Path) -> Dict[str, Any]:
+    """Scans the head of an MPEG-TS segment for PAT/PMT, the first PTS and a leading keyframe."""
+    info: Dict[str, Any] = {"pat": False, "pmt": False, "first_pts": None, "keyframe": None, "codec": None, "issues": []}
+    with open(segment_path, "rb") as f:
+        data = f.read(TS_PACKET_SIZE * TS_HEAD_PACKETS)
+
+    if not data or data[0] != TS_SYNC_BYTE:
+        info["issues"].append("does not start with a TS sync byte")
+        return info
+
+    pmt_pids = set()
+    video_pid = None
+    audio_pid = None
+    video_es = bytearray()
+    video_pes_started = False
+
+    for offset in range(0, len(data) - TS_PACKET_SIZE + 1, TS_PACKET_SIZE):
+        packet = data[offset:offset + TS_PACKET_SIZE]
+        if packet[0] != TS_SYNC_BYTE:
+            info["issues"].append(f"lost TS sync at byte {offset}")
+            break
+        pusi = bool(packet[1] & 0x40)
+        pid = ((packet[1] & 0x1F) << 8) | packet[2]
+        adaptation = (packet[3] >> 4) & 0x03
+        if not adaptation & 0x01:
+            continue # No payload
+        start = 4 + (1 + packet[4] if adaptation & 0x02 else 0)
+        payload = packet[start:]
+        if not payload:
+            continue
+
+        if pid == 0 and pusi:
+            section = psi_section(payload, 0x00, 12)
+            if section is None:
+                info["issues"].append(f"malformed or truncated PAT at byte {offset}")
+                continue
+            for i in range(8, len(section) - 4 - 3, 4):
+                if (section[i] << 8 | section[i + 1]) != 0: # Skip the network PID entry
+                    pmt_pids.add(((section[i + 2] & 0x1F) << 8) | section[i + 3])
+            info["pat"] = True
+        elif pid in pmt_pids and pusi:
+            section = psi_section(payload, 0x02, 16)
+            if section is None:
+                info["issues"].append(f"malformed or truncated PMT at byte {offset}")
+                continue
+            i = 12 + (((section[10] & 0x0F) << 8) | section[11])
+            while i + 5 <= len(section) - 4:
+                stream_type = section[i]
+                es_pid = ((section[i + 1] & 0x1F) << 8) | section[i + 2]
+                if stream_type in VIDEO_STREAM_TYPES and video_pid is None:
+                    video_pid = es_pid
+                    info["codec"] = VIDEO_STREAM_TYPES[stream_type]
+                elif stream_type in AUDIO_STREAM_TYPES and audio_pid is None:
+                    audio_pid = es_pid
+                i += 5 + (((section[i + 3] & 0x0F) << 8) | section[i + 4])
+            info["pmt"] = True
+        elif pid == video_pid:
+            if pusi:
+                if video_pes_started:
+                    break # Whole first PES collected
+                video_pes_started = True
+                info["first_pts"] = parse_pes_pts(payload)
+                payload = payload[9 + payload[8]:] if len(payload) > 8 else b""
+            if video_pes_started:
+                video_es.extend(payload)
+                info["keyframe"] = first_vcl_is_keyframe(bytes(video_es), info["codec"])
+                if info["keyframe"] is not None:
+                    break
+        elif pid == audio_pid and pusi and video_pid is None and info["first_pts"] is None:
+            info["first_pts"] = parse_pes_pts(payload)
+            break # Audio-only rendition, nothing more to look for
+
+    if not info["pat"]:
+        info["issues"].append("no PAT at segment start")
+    if not info["pmt"]:
+        info["issues"].append("no PMT at segment start")
+    elif video_pid is None and audio_pid is None:
+        info["issues"].append("PMT lists no known audio or video stream")
+    if info["first_pts"] is None and info["pmt"]:
+        info["issues"].append("no PTS found in the first PES packet")
+    return info
+
+def scan_media_playlist(playlist_path: Path, kind: str, tolerance: float) -> Dict[str, Any]:
+    """Validates one media playlist and the TS segments it references."""
+    result: Dict[str, Any] = {"path": str(playlist_path), "kind": kind, "durations": [], "first_pts": [], "issues": []}
+    issues = result["issues"]
+    if not playlist_path.exists():
+        issues.append(f"{playlist_path}: playlist is missing")
+        return result
+
+    try:
+        playlist = parse_media_playlist(playlist_path)
+    except (OSError, UnicodeDecodeError) as e:
+        issues.append(f"{playlist_path}: could not read playlist: {e}")
+        return result
+    issues.extend(f"{playlist_path}: {error}" for error in playlist["errors"])
+    result["target_duration"] = playlist["target_duration"]
+    if playlist["target_duration"] is None and not any("TARGETDURATION" in error for error in playlist["errors"]):
+        issues.append(f"{playlist_path}: missing #EXT-X-TARGETDURATION")
+    if not playlist["endlist"]:
+        issues.append(f"{playlist_path}: missing #EXT-X-ENDLIST for a VOD playlist")
+    if not playlist["segments"]:
+        issues.append(f"{playlist_path}: playlist has no segments")
+
+    for index, (uri, duration) in enumerate(playlist["segments"]):
+        segment_path = playlist_path.parent / uri
+        result["durations"].append(duration)
+        if duration is None:
+            issues.append(f"{segment_path}: missing or invalid #EXTINF")
+        elif playlist["target_duration"] is not None and round(duration) > playlist["target_duration"]:
+            issues.append(f"{segment_path}: duration {duration:.3f}s exceeds target duration {playlist['target_duration']}s")
+
+        if not segment_path.exists() or segment_path.stat().st_size == 0:
+            issues.append(f"{segment_path}: segment is missing or empty")
+            result["first_pts"].append(None)
+            continue
+        if segment_path.stat().st_size % TS_PACKET_SIZE:
+            issues.append(f"{segment_path}: size is not a multiple of {TS_PACKET_SIZE} bytes")
+
+        try:
+            info = scan_ts_segment(segment_path)
+        except (OSError, IndexError, ValueError) as e:
+            issues.append(f"{segment_path}: could not be scanned: {e}")
+            result["first_pts"].append(None)
+            continue
+        result["first_pts"].append(info["first_pts"])
+        issues.extend(f"{segment_path}: {issue}" for issue in info["issues"])
+        if kind == "video" and info["keyframe"] is False:
+            issues.append(f"{segment_path}: does not start with an IDR/IRAP frame")
+        elif kind == "video" and info["codec"] is None and info["pmt"]:
+            issues.append(f"{segment_path}: no H.264/HEVC stream in a video rendition")
+
+        previous_pts = result["first_pts"][index - 1] if index else None
+        previous_duration = result["durations"][index - 1] if index else None
+        if previous_pts is not None and info["first_pts"] is not None and previous_duration is not None:
+            measured = ((info["first_pts"] - previous_pts) % PTS_WRAP) / PTS_CLOCK
+            if abs(measured - previous_duration) > tolerance:
+                issues.append(
+                    f"{segment_path}: PTS gap from previous segment is {measured:.3f}s "
+                    f"but #EXTINF says {previous_duration:.3f}s"
+                )
+    return result
+
+def check_subtitle_file(vtt_path: Path) -> List[str]:
+    """Checks that a WebVTT file exists, is non-empty and carries the WEBVTT signature."""
+    if not vtt_path.exists() or vtt_path.stat().st_size == 0:
+        return [f"{vtt_path}: subtitle file is missing or empty"]
+    with open(vtt_path, "rb") as f:
+        head = f.read(16)
+    if not head.lstrip(b"\xef\xbb\xbf").startswith(b"WEBVTT"):
+        return [f"{vtt_path}: missing WEBVTT header"]
+    return []
+
+def validate_hls_package(
+    output_dir: Path,
+    max_workers: Optional[int] = None,
+    tolerance: Optional[float] = None,
+    expected_subtitles: Optional[int] = None
+) -> List[str]:
+    """Validates a generated HLS package and returns a list of problems found."""
+    validation_config = APP_CONFIG["validation"]
+    max_workers = max_workers or validation_config["max_workers"] or None
+    tolerance = tolerance if tolerance is not None else validation_config["duration_tolerance"]
+    master_path = output_dir / "master.m3u8"
+    logging.info(f"Validating HLS package: {master_path}")
+
+    if not master_path.exists():
+        issues = [f"{master_path}: master playlist is missing"]
+        logging.error(issues[0])
+        return issues
+
+    try:
+        entries = parse_master_playlist(master_path)
+    except (OSError, UnicodeDecodeError) as e:
+        issues = [f"{master_path}: could not read master playlist: {e}"]
+        logging.error(issues[0])
+        return issues
+    issues = []
+    if not entries["video"]:
+        issues.append(f"{master_path}: no video variants listed")
+
+    for uri in entries["subtitles"]:
+        subtitle_path = output_dir / uri
+        if uri.endswith(".m3u8") and subtitle_path.exists():
+            try:
+                subtitle_playlist = parse_media_playlist(subtitle_path)
+            except (OSError, UnicodeDecodeError) as e:
+                issues.append(f"{subtitle_path}: could not read playlist: {e}")
+                continue
+            issues.extend(f"{subtitle_path}: {error}" for error in subtitle_playlist["errors"])
+            for vtt_uri, _ in subtitle_playlist["segments"]:
+                issues.extend(check_subtitle_file(subtitle_path.parent / vtt_uri))
+        else:
+            issues.extend(check_subtitle_file(subtitle_path))
+    if expected_subtitles is not None and len(entries["subtitles"]) < expected_subtitles:
+        issues.append(f"{master_path}: only {len(entries['subtitles'])} of {expected_subtitles} subtitle tracks were packaged")
+
+    jobs = [(output_dir / uri, "video") for uri in entries["video"]] + [(output_dir / uri, "audio") for uri in entries["audio"]]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            scan_media_playlist,
+            [path for path, _ in jobs], [kind for _, kind in jobs], [tolerance] * len(jobs)
+        ))
+    for result in results:
+        issues.extend(result["issues"])
+
+    # Every video rung must be cut at the same points for seamless ABR switching
+    video_results = [r for r in results if r["kind"] == "video" and r["durations"]]
+    if video_results:
+        reference = video_results[0]
+        for other in video_results[1:]:
+            if len(other["durations"]) != len(reference["durations"]):
+                issues.append(
+                    f"{other['path']}: {len(other['durations'])} segments but "
+                    f"{reference['path']} has {len(reference['durations'])}"
+                )
+                continue
+            for index, (ref_duration, duration) in enumerate(zip(reference["durations"], other["durations"])):
+                if ref_duration is not None and duration is not None and abs(ref_duration - duration) > tolerance:
+                    issues.append(
+                        f"{other['path']}: segment {index} lasts {duration:.3f}s but "
+                        f"{reference['path']} segment {index} lasts {ref_duration:.3f}s"
+                    )
+                    break
+            for index, (ref_pts, pts) in enumerate(zip(reference["first_pts"], other["first_pts"])):
+                if ref_pts is not None and pts is not None:
+                    drift = min((pts - ref_pts) % PTS_WRAP, (ref_pts - pts) % PTS_WRAP) / PTS_CLOCK
+                    if drift > tolerance:
+                        issues.append(
+                            f"{other['path']}: segment {index} starts {drift:.3f}s away from "
+                            f"{reference['path']} segment {index}"
+                        )
+                        break
+
+        # Audio is not cut on video keyframes, so allow up to one segment of drift in total length
+        video_total = sum(d for d in reference["durations"] if d is not None)
+        allowed_drift = max(reference.get("target_duration") or 0, tolerance)
+        for result in results:
+            if result["kind"] == "audio" and result["durations"]:
+                audio_total = sum(d for d in result["durations"] if d is not None)
+                if abs(audio_total - video_total) > allowed_drift:
+                    issues.append(
+                        f"{result['path']}: total duration {audio_total:.3f}s differs from "
+                        f"video total {video_total:.3f}s"
+                    )
+
+    segment_count = sum(len(r["durations"]) for r in results)
+    if issues:
+        for issue in issues:
+            logging.error(f"Validation: {issue}")
+        logging.error(f"❌ Validation found {len(issues)} problem(s) across {len(results)} playlists and {segment_count} segments.")
+    else:
+        logging.info(f"✅ Validation passed: {len(results)} playlists, {segment_count} segments.")
+    return issues
+
 # --- Deployment (GitHub Pages Example) ---
 def deploy_to_github_pages(
     folder_to_upload: Path,
@@ -547,7 +1262,7 @@ def deploy_to_internet_archive(
     console.print(f"\n[bold green]✅ Upload complete Check : {worker_url}{BASE_ARCHIVE_URL}/master.m3u8.[/bold green]")
 # --- Main HLS Generation Function ---
 def create_hls_package(
-    input_file: Path,
+    input_file: Union[Path, str],
     output_dir: Path,
     segment_duration: int,
     ffmpeg_preset: str,
@@ -558,90 +1273,624 @@ def create_hls_package(
     github_username: Optional[str] = None,
     github_repo: Optional[str] = None,
     github_token: Optional[str] = None,
-    github_branch: Optional[str] = None
-):
-    """Main function to orchestrate HLS package creation."""
-    if not input_file.exists():
+    github_branch: Optional[str] = None,
+    validate: bool = False
+) -> bool:
+    """Main function to orchestrate HLS package creation. Returns True on success.
+
+    `input_file` may also be "-" (stdin), a named pipe or an HTTP(S) URL. Such inputs are read once and
+    streamed through a single FFmpeg pipeline; they are only spilled to disk if they cannot be probed
+    from their first bytes (e.g. an MP4 whose moov atom is at the end).
+    """
+    source = str(input_file)
+    try:
+        stream = open_input_stream(source)
+    except OSError as e:
+        logging.error(f"Could not open input stream {source}: {e}")
+        return False
+    input_file = Path(source)
+    if stream is None and not input_file.exists():
         logging.error(f"Input file not found: {input_file}")
-        return
+        return False
 
     output_dir.mkdir(parents=True, exist_ok=True)
-    logging.info(f"Starting HLS packaging for {input_file} into {output_dir}")
-
+    logging.info(f"Starting HLS packaging for {source} into {output_dir}")
+
+    input_stream = stream
+    spill_file = None
+    stream_prefix = None
+    metadata = None
+    spill_dir = Path(APP_CONFIG["streaming"]["spill_dir"] or tempfile.gettempdir())
+    spill_suffix = Path(urlparse(source).path).suffix
     try:
-        metadata = get_video_metadata(input_file)
-    except Exception as e:
-        logging.error(f"Could not get video metadata. Aborting. Error: {e}")
-        return
-        
-    all_streams = metadata.get("streams", [])
-    input_video_height = get_input_video_resolution(all_streams)
-    if input_video_height:
-        logging.info(f"Detected input video resolution: {input_video_height[0]}x{input_video_height[1]}")
-    else:
-        logging.warning("Could not determine input video resolution. Quality selection might not be optimal.")
-
-    audio_streams = [s for s in all_streams if s["codec_type"] == "audio"]
-    subtitle_streams = [s for s in all_streams if s["codec_type"] == "subtitle"]
-
-    # Determine which video qualities to process
-    available_qualities = list(VIDEO_VARIANTS.keys())
-    if video_qualities_str:
-        selected_qualities = [q.strip() for q in video_qualities_str.split(",")]
-        # Validate selected qualities
-        valid_selected_qualities = [q for q in selected_qualities if q in available_qualities]
-        invalid_qualities = set(selected_qualities) - set(valid_selected_qualities)
-        if invalid_qualities:
-            logging.warning(f"Ignoring invalid video qualities: {', '.join(invalid_qualities)}. Available: {', '.join(available_qualities)}")
-        selected_qualities = valid_selected_qualities
-        if not selected_qualities:
-            logging.warning("No valid video qualities selected. Defaulting to all suitable qualities.")
-            selected_qualities = available_qualities # Fallback or choose a default set
-    else: # If no qualities specified, use all available that are not upscales
-        selected_qualities = available_qualities
-
-    logging.info(f"Target video qualities: {', '.join(selected_qualities)}")
-
-    video_paths = generate_video_renditions(
-        input_file, output_dir, segment_duration, ffmpeg_preset, selected_qualities, input_video_height[1] if input_video_height else None
-    )
-    if not video_paths:
-        logging.error("Failed to generate any video renditions. Aborting.")
-        return
+        if stream is not None:
+            try:
+                stream_prefix = read_prefix(stream, APP_CONFIG["streaming"]["probe_bytes"])
+            except Exception as e:
+                logging.error(f"Could not read input stream {source}: {e!r}")
+                return False
+            try:
+                metadata = get_video_metadata(source, prefix=stream_prefix)
+            except Exception as e:
+                logging.debug(f"Probing the stream prefix failed: {e}")
+            if not metadata or not get_input_video_resolution(metadata.get("streams", [])):
+                logging.warning(f"Input cannot be probed from its first {len(stream_prefix)} bytes and needs seeking. Spilling it to {spill_dir}.")
+                try:
+                    spill_file = spill_input_to_disk(stream_prefix, stream, spill_dir, spill_suffix)
+                except Exception as e:
+                    logging.error(f"Could not read input stream {source}: {e!r}")
+                    return False
+                stream = None # input_stream is still closed below
+                metadata = None
+                input_file = spill_file
+
+        if metadata is None:
+            try:
+                metadata = get_video_metadata(input_file)
+            except Exception as e:
+                logging.error(f"Could not get video metadata. Aborting. Error: {e}")
+                return False
+
+        job = getattr(JOB_CONTEXT, "job", None)
+        if job is not None:
+            try: # Used for progress percentages; a streamed input probed from its prefix may have none
+                job["duration"] = float(metadata["format"]["duration"])
+            except (KeyError, TypeError, ValueError):
+                job["duration"] = None
+
+        all_streams = metadata.get("streams", [])
+        input_video_height = get_input_video_resolution(all_streams)
+        if input_video_height:
+            logging.info(f"Detected input video resolution: {input_video_height[0]}x{input_video_height[1]}")
+        else:
+            logging.warning("Could not determine input video resolution. Quality selection might not be optimal.")
+
+        audio_streams = [s for s in all_streams if s["codec_type"] == "audio"]
+        subtitle_streams = [s for s in all_streams if s["codec_type"] == "subtitle"]
+
+        # Determine which video qualities to process
+        available_qualities = list(VIDEO_VARIANTS.keys())
+        if video_qualities_str:
+            selected_qualities = [q.strip() for q in video_qualities_str.split(",")]
+            # Validate selected qualities
+            valid_selected_qualities = [q for q in selected_qualities if q in available_qualities]
+            invalid_qualities = set(selected_qualities) - set(valid_selected_qualities)
+            if invalid_qualities:
+                logging.warning(f"Ignoring invalid video qualities: {', '.join(invalid_qualities)}. Available: {', '.join(available_qualities)}")
+            selected_qualities = valid_selected_qualities
+            if not selected_qualities:
+                logging.warning("No valid video qualities selected. Defaulting to all suitable qualities.")
+                selected_qualities = available_qualities # Fallback or choose a default set
+        else: # If no qualities specified, use all available that are not upscales
+            selected_qualities = available_qualities
+
+        logging.info(f"Target video qualities: {', '.join(selected_qualities)}")
+
+        # Both the file and the stream path skip bitmap subtitles, so the validator only expects text tracks
+        expected_subtitles = sum(1 for s in subtitle_streams if s.get("codec_name") in TEXT_SUBTITLE_CODECS)
+        if stream is not None:
+            thumbnail_file = output_dir / f"{input_stem(source)}_thumbnail.jpg" if generate_thumb else None
+            is_mov = any(name in ("mov", "mp4") for name in metadata.get("format", {}).get("format_name", "").split(","))
+            try:
+                video_paths, audio_playlists, subtitle_playlists = generate_renditions_from_stream(
+                    stream_prefix, stream, output_dir, segment_duration, ffmpeg_preset, selected_qualities,
+                    input_video_height[1] if input_video_height else None, audio_streams, subtitle_streams,
+                    thumbnail_file, thumbnail_time
+                )
+            except InputStreamError as e:
+                logging.error(f"{e}. The package is incomplete. Aborting.")
+                return False
+            except subprocess.CalledProcessError:
+                # MP4/MOV whose audio and video chunks are far apart make the demuxer seek, which a pipe can't do
+                if not is_mov:
+                    raise
+                if not source.startswith(("http://", "https://")):
+                    logging.error("The MP4/MOV pipeline failed, probably because the input is not interleaved and needs seeking. "
+                                  "Pass it as a file or URL, or remux it (e.g. with -movflags +faststart) before streaming.")
+                    raise
+                logging.warning(f"The MP4/MOV pipeline failed, probably because the input needs seeking. Downloading it again into {spill_dir}.")
+                input_stream.close()
+                try:
+                    input_stream = open_input_stream(source)
+                    spill_file = spill_input_to_disk(b"", input_stream, spill_dir, spill_suffix)
+                except Exception as e:
+                    logging.error(f"Could not read input stream {source}: {e!r}")
+                    return False
+                stream = None
+                input_file = spill_file
+            else:
+                if not video_paths:
+                    logging.error("Failed to generate any video renditions. Aborting.")
+                    return False
+
+        if stream is None:
+            video_paths = generate_video_renditions(
+                input_file, output_dir, segment_duration, ffmpeg_preset, selected_qualities, input_video_height[1] if input_video_height else None
+            )
+            if not video_paths:
+                logging.error("Failed to generate any video renditions. Aborting.")
+                return False
 
-    audio_playlists = generate_audio_renditions(
-        input_file, output_dir, audio_streams, segment_duration, ffmpeg_preset
-    )
-    subtitle_playlists = generate_subtitle_renditions(
-        input_file, output_dir, subtitle_streams
-    )
+            audio_playlists = generate_audio_renditions(
+                input_file, output_dir, audio_streams, segment_duration, ffmpeg_preset
+            )
+            subtitle_playlists = generate_subtitle_renditions(
+                input_file, output_dir, subtitle_streams
+            )
+
+        generate_master_playlist(output_dir, video_paths, audio_playlists, subtitle_playlists)
 
-    generate_master_playlist(output_dir, video_paths, audio_playlists, subtitle_playlists)
+        if generate_thumb and stream is None:
+            generate_thumbnail(input_file, output_dir, thumbnail_time, input_stem(source))
 
-    if generate_thumb:
-        generate_thumbnail(input_file, output_dir, thumbnail_time)
+        logging.info(f"✅ HLS packaging complete. Master playlist: {output_dir / 'master.m3u8'}")
 
-    logging.info(f"✅ HLS packaging complete. Master playlist: {output_dir / 'master.m3u8'}")
+        if validate and validate_hls_package(output_dir, expected_subtitles=expected_subtitles):
+            logging.error("HLS package failed validation. Skipping deployment.")
+            return False
 
-    if deploy_gh and APP_CONFIG["github_deployment"]["enabled"]:
-        deploy_to_github_pages(
-            output_dir,
-            github_username or os.getenv("GITHUB_USERNAME"),
-            github_repo or os.getenv("GITHUB_REPO"),
-            github_token or os.getenv("GITHUB_TOKEN"),
-            github_branch or os.getenv("GITHUB_BRANCH") or APP_CONFIG["github_deployment"]["default_branch"]
+        if deploy_gh and APP_CONFIG["github_deployment"]["enabled"]:
+            deploy_to_github_pages(
+                output_dir,
+                github_username or os.getenv("GITHUB_USERNAME"),
+                github_repo or os.getenv("GITHUB_REPO"),
+                github_token or os.getenv("GITHUB_TOKEN"),
+                github_branch or os.getenv("GITHUB_BRANCH") or APP_CONFIG["github_deployment"]["default_branch"]
+            )
+        elif deploy_gh:
+            logging.warning("GitHub deployment was requested but is disabled in config.json or missing credentials.")
+        return True
+    finally:
+        if input_stream is not None and input_stream is not sys.stdin.buffer:
+            # After a cancel, the abandoned feeder may still be blocked reading an HTTP response, and
+            # closing that would wait for the read to time out; don't hold the worker for it
+            threading.Thread(target=input_stream.close, daemon=True).start()
+        if spill_file is not None and spill_file.exists():
+            spill_file.unlink()
+
+# --- Packaging Daemon ---
+JOB_STATES_FINISHED = ("succeeded", "failed", "cancelled")
+JOB_EVENT_LIMIT = 500 # Per job; older events are dropped
+INBOX_CLAIM_PATTERN = re.compile(r"^[0-9a-f]{12}_") # job id prefix given to claimed inbox files
+
+class JobLogHandler(logging.Handler):
+    """Forwards log records emitted by a daemon worker thread into its job's event stream."""
+
+    def __init__(self, daemon: "PackagingDaemon"):
+        super().__init__(level=logging.INFO)
+        self.daemon = daemon
+
+    def emit(self, record: logging.LogRecord):
+        job_id = self.daemon.worker_jobs.get(record.thread)
+        if job_id is not None:
+            self.daemon.add_event(job_id, "log", level=record.levelname, message=record.getMessage())
+
+class PackagingDaemon:
+    """Keeps configuration loaded and runs packaging jobs from a priority queue."""
+
+    def __init__(self, output_root: Path, max_concurrent_jobs: int, inbox_dir: Optional[Path] = None, poll_interval: float = 2):
+        self.output_root = output_root
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        self.inbox_dir = inbox_dir
+        self.poll_interval = poll_interval
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.queue: "queue.PriorityQueue[Tuple[int, int, str]]" = queue.PriorityQueue()
+        self.worker_jobs: Dict[int, str] = {} # Worker thread ident -> running job id
+        self.condition = threading.Condition()
+        self.sequence = itertools.count()
+        self.log_handler = JobLogHandler(self)
+
+    def start(self):
+        logging.getLogger().addHandler(self.log_handler)
+        for i in range(self.max_concurrent_jobs):
+            threading.Thread(target=self.worker_loop, name=f"hls-worker-{i}", daemon=True).start()
+        if self.inbox_dir:
+            for sub_dir in ("processing", "done", "failed"):
+                (self.inbox_dir / sub_dir).mkdir(parents=True, exist_ok=True)
+            self.requeue_leftover_inbox_files()
+            threading.Thread(target=self.watch_inbox, name="hls-inbox", daemon=True).start()
+            logging.info(f"Watching inbox: {self.inbox_dir}")
+
+    def requeue_leftover_inbox_files(self):
+        """Re-queues files left in processing/ by a previous daemon that stopped mid-job."""
+        for path in sorted((self.inbox_dir / "processing").iterdir()):
+            if path.is_file():
+                logging.warning(f"Re-queuing inbox file left over from a previous run: {path.name}")
+                self.submit_inbox_file(path, INBOX_CLAIM_PATTERN.sub("", path.name))
+
+    def submit_inbox_file(self, path: Path, original_name: str):
+        """Claims an inbox file under a job-id-prefixed name (so same-named files never collide) and queues it."""
+        job_id = uuid.uuid4().hex[:12]
+        processing_path = self.inbox_dir / "processing" / f"{job_id}_{original_name}"
+        try:
+            path.rename(processing_path)
+        except OSError as e:
+            logging.warning(f"Could not claim inbox file {path}: {e}")
+            return
+        self.submit({
+            "input": str(processing_path),
+            "output": str(self.output_root / f"{Path(original_name).stem}_{job_id}")
+        }, source="inbox", job_id=job_id)
+
+    def prune_finished_jobs(self):
+        """Forgets finished jobs past the TTL or beyond the retention limit. Call with the condition held."""
+        daemon_config = APP_CONFIG["daemon"]
+        expires_before = time.time() - daemon_config["finished_job_ttl"]
+        finished = sorted(
+            (job["finished_at"], job_id) for job_id, job in self.jobs.items() if job["status"] in JOB_STATES_FINISHED
         )
-    elif deploy_gh:
-        logging.warning("GitHub deployment was requested but is disabled in config.json or missing credentials.")
+        excess = len(finished) - daemon_config["max_finished_jobs"]
+        for index, (finished_at, job_id) in enumerate(finished):
+            if index < excess or finished_at < expires_before:
+                del self.jobs[job_id]
+
+    def add_event(self, job_id: str, event_type: str, **fields):
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None: # Already pruned
+                return
+            job["last_event"] += 1
+            job["events"].append({"seq": job["last_event"], "time": time.time(), "type": event_type, **fields})
+            del job["events"][:-JOB_EVENT_LIMIT]
+            self.condition.notify_all()
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None: # Already pruned
+                return
+            job["status"] = status
+            job["error"] = error
+            if status == "running":
+                job["started_at"] = time.time()
+            elif status in JOB_STATES_FINISHED:
+                job["finished_at"] = time.time()
+        self.add_event(job_id, "status", status=status, error=error)
+        if status in JOB_STATES_FINISHED:
+            with self.condition:
+                self.prune_finished_jobs()
+
+    def submit(self, options: Dict[str, Any], source: str = "api", job_id: Optional[str] = None) -> Dict[str, Any]:
+        """Queues a packaging job. Raises ValueError for invalid options."""
+        if not options.get("input"):
+            raise ValueError("'input' is required")
+        if options["input"] == "-":
+            raise ValueError("stdin input is not available to daemon jobs; use a named pipe or URL")
+        job_id = job_id or uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "source": source,
+            "input": str(options["input"]),
+            # The job id keeps outputs of same-named inputs apart
+            "output": str(options.get("output") or self.output_root / f"{input_stem(str(options['input']))}_{job_id}"),
+            "priority": int(options.get("priority", 0)),
+            "video_qualities": options.get("video_qualities"),
+            "segment_duration": int(options.get("segment_duration", APP_CONFIG["default_segment_duration"])),
+            "preset": options.get("preset", APP_CONFIG["default_ffmpeg_preset"]),
+            "thumbnail": bool(options.get("thumbnail", True)),
+            "thumbnail_time": options.get("thumbnail_time", "00:00:05"),
+            "validate": bool(options.get("validate", False)),
+            "status": "queued",
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "duration": None, # Probed input duration in seconds, once known
+            "cancel_requested": False,
+            "process": None,
+            "events": [],
+            "last_event": 0,
+        }
+        with self.condition:
+            self.jobs[job_id] = job
+        self.add_event(job_id, "status", status="queued", error=None)
+        # Higher priority runs first; equal priorities run in submission order
+        self.queue.put((-job["priority"], next(self.sequence), job_id))
+        logging.info(f"Queued job {job_id} ({source}): {job['input']} -> {job['output']} (priority {job['priority']})")
+        return self.describe(job_id)
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        with self.condition:
+            job = self.jobs[job_id]
+            if job["status"] in JOB_STATES_FINISHED:
+                return self.describe(job_id)
+            job["cancel_requested"] = True
+            process = job["process"]
+            queued = job["status"] == "queued"
+        if process is not None:
+            process.terminate()
+        if queued: # The worker skips it when it is dequeued
+            self.set_status(job_id, "cancelled")
+        logging.info(f"Cancellation requested for job {job_id}")
+        return self.describe(job_id)
+
+    def describe(self, job_id: str) -> Dict[str, Any]:
+        """Returns the JSON-safe public view of a job. Raises KeyError for unknown (or pruned) jobs."""
+        with self.condition:
+            job = self.jobs[job_id]
+            return {k: v for k, v in job.items() if k not in ("process", "events", "cancel_requested")}
+
+    def list_jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self.condition:
+            job_ids = [job_id for job_id, job in self.jobs.items() if status is None or job["status"] == status]
+            return [self.describe(job_id) for job_id in job_ids]
+
+    def events_since(self, job_id: str, since: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """Waits for events newer than `since`; returns them and whether the job has finished."""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None: # Pruned
+                return [], True
+            self.condition.wait_for(
+                lambda: job["last_event"] > since or job["status"] in JOB_STATES_FINISHED, timeout=timeout
+            )
+            events = [event for event in job["events"] if event["seq"] > since]
+            return events, job["status"] in JOB_STATES_FINISHED
+
+    def worker_loop(self):
+        thread_id = threading.get_ident()
+        while True:
+            _, _, job_id = self.queue.get()
+            # Check for cancellation and claim the job atomically, so cancel() can't slip in between
+            with self.condition:
+                job = self.jobs.get(job_id)
+                if job is None or job["cancel_requested"]: # Cancelled (and possibly pruned) while queued
+                    continue
+                job["status"] = "running"
+                job["started_at"] = time.time()
+            try:
+                self.worker_jobs[thread_id] = job_id
+                JOB_CONTEXT.job = job
+                JOB_CONTEXT.report_progress = lambda **fields: self.add_event(job_id, "progress", **fields)
+                self.add_event(job_id, "status", status="running", error=None)
+                self.run_job(job)
+                if job["source"] == "inbox":
+                    self.archive_inbox_file(job)
+                logging.info(f"Job {job_id} {job['status']}.")
+            except Exception as e: # Never let a bookkeeping error kill the worker and lower concurrency
+                logging.error(f"Worker error while handling job {job_id}: {e}")
+            finally:
+                JOB_CONTEXT.job = None
+                JOB_CONTEXT.report_progress = None
+                self.worker_jobs.pop(thread_id, None)
+
+    def run_job(self, job: Dict[str, Any]):
+        """Packages one claimed job on the current worker thread and records its final status."""
+        job_id = job["id"]
+        try:
+            packaged = create_hls_package(
+                input_file=job["input"],
+                output_dir=Path(job["output"]),
+                segment_duration=job["segment_duration"],
+                ffmpeg_preset=job["preset"],
+                video_qualities_str=job["video_qualities"],
+                generate_thumb=job["thumbnail"],
+                thumbnail_time=job["thumbnail_time"],
+                validate=job["validate"]
+            )
+            if job["cancel_requested"]:
+                self.set_status(job_id, "cancelled")
+            elif packaged:
+                self.set_status(job_id, "succeeded")
+            else:
+                self.set_status(job_id, "failed", "Packaging failed; see job events for details.")
+        except JobCancelled:
+            self.set_status(job_id, "cancelled")
+        except SystemExit: # run_command exits when FFmpeg/FFprobe is missing
+            self.set_status(job_id, "failed", f"An external command was not found; check ffmpeg_path/ffprobe_path in {CONFIG_FILE}.")
+        except Exception as e:
+            if job["cancel_requested"]:
+                self.set_status(job_id, "cancelled")
+            else:
+                logging.error(f"Job {job_id} failed: {e}")
+                self.set_status(job_id, "failed", str(e) or type(e).__name__)
+
+    def archive_inbox_file(self, job: Dict[str, Any]):
+        """Moves a finished inbox file out of processing/ so it is not picked up again."""
+        target_dir = self.inbox_dir / ("done" if job["status"] == "succeeded" else "failed")
+        source = Path(job["input"])
+        try:
+            shutil.move(str(source), str(target_dir / source.name))
+        except OSError as e:
+            logging.warning(f"Could not move {source} to {target_dir}: {e}")
+
+    def watch_inbox(self):
+        """Polls the inbox and submits files whose size has stopped changing."""
+        extensions = {ext.lower() for ext in APP_CONFIG["daemon"]["inbox_extensions"]}
+        last_sizes: Dict[Path, int] = {}
+        while True:
+            current_sizes = {}
+            try:
+                for path in self.inbox_dir.iterdir():
+                    if path.is_file() and path.suffix.lower() in extensions:
+                        current_sizes[path] = path.stat().st_size
+            except OSError as e:
+                logging.warning(f"Could not scan inbox {self.inbox_dir}: {e}")
+            for path, size in current_sizes.items():
+                if last_sizes.get(path) != size:
+                    continue # Still being written, or first sighting
+                self.submit_inbox_file(path, path.name)
+            last_sizes = current_sizes
+            time.sleep(self.poll_interval)
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """Local HTTP/JSON API for the packaging daemon.
+
+    POST /jobs, GET /jobs[?status=], GET /jobs/<id>, POST /jobs/<id>/cancel (or DELETE /jobs/<id>)
+    and GET /jobs/<id>/events[?since=N], which streams newline-delimited JSON until the job finishes.
+    """
+    daemon: PackagingDaemon # Set by serve_main
+
+    def log_message(self, format, *args):
+        logging.debug(f"HTTP {self.address_string()} {format % args}")
+
+    def send_json(self, status: int, body: Any):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def route(self) -> Tuple[List[str], Dict[str, List[str]]]:
+        url = urlparse(self.path)
+        return [part for part in url.path.split("/") if part], parse_qs(url.query)
+
+    def do_GET(self):
+        parts, query = self.route()
+        try:
+            if parts == ["jobs"]:
+                self.send_json(200, self.daemon.list_jobs(query.get("status", [None])[0]))
+            elif len(parts) == 2 and parts[0] == "jobs":
+                self.send_json(200, self.daemon.describe(parts[1]))
+            elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+                try:
+                    since = int(query.get("since", ["0"])[0])
+                except ValueError:
+                    self.send_json(400, {"error": "'since' must be an integer"})
+                    return
+                self.daemon.describe(parts[1]) # 404 before the stream starts
+                self.stream_events(parts[1], since)
+            else:
+                self.send_json(404, {"error": "not found"})
+        except KeyError: # Unknown or pruned job
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        parts, _ = self.route()
+        if parts == ["jobs"]:
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                options = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(options, dict):
+                    raise ValueError("request body must be a JSON object")
+                self.send_json(201, self.daemon.submit(options))
+            except (ValueError, TypeError) as e: # json.JSONDecodeError is a ValueError
+                self.send_json(400, {"error": str(e)})
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            self.send_cancel(parts[1])
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        parts, _ = self.route()
+        if len(parts) == 2 and parts[0] == "jobs":
+            self.send_cancel(parts[1])
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def send_cancel(self, job_id: str):
+        try:
+            self.send_json(200, self.daemon.cancel(job_id))
+        except KeyError: # Unknown or pruned job
+            self.send_json(404, {"error": "not found"})
+
+    def stream_events(self, job_id: str, since: int):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.close_connection = True # Stream ends when the connection closes
+        finished = False
+        try:
+            while not finished:
+                events, finished = self.daemon.events_since(job_id, since, timeout=15)
+                for event in events:
+                    self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+                    since = event["seq"]
+                if not events:
+                    self.wfile.write(b"\n") # Keep-alive so idle clients notice a dead daemon
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
 
 
 # --- CLI Argument Parsing ---
+def validate_main(argv: List[str]):
+    """Entry point for the `validate` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="main.py validate",
+        description="Validate a generated HLS package: playlists, segment alignment across renditions, TS structure and subtitles.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("output", type=Path, help="HLS output directory containing master.m3u8.")
+    parser.add_argument(
+        "--workers", type=int, default=APP_CONFIG["validation"]["max_workers"],
+        help="Number of parallel worker processes (0 means one per CPU)."
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=APP_CONFIG["validation"]["duration_tolerance"],
+        help="Allowed drift in seconds between #EXTINF durations, PTS and other renditions."
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="Enable verbose debug logging."
+    )
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    issues = validate_hls_package(args.output, max_workers=args.workers, tolerance=args.tolerance)
+    sys.exit(1 if issues else 0)
+
+def serve_main(argv: List[str]):
+    """Entry point for the `serve` subcommand (long-running packaging daemon)."""
+    daemon_config = APP_CONFIG["daemon"]
+    parser = argparse.ArgumentParser(
+        prog="main.py serve",
+        description="Run V2HLS as a resident packaging daemon with a watch folder and a local HTTP/JSON job API.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--host", type=str, default=daemon_config["host"], help="Address for the HTTP API to listen on.")
+    parser.add_argument("--port", type=int, default=daemon_config["port"], help="Port for the HTTP API.")
+    parser.add_argument(
+        "--inbox", type=Path, default=Path(daemon_config["inbox_dir"]) if daemon_config["inbox_dir"] else None,
+        help="Watch folder; video files dropped here are packaged automatically."
+    )
+    parser.add_argument(
+        "--output-root", type=Path, default=Path(daemon_config["output_root"]),
+        help="Directory under which jobs without an explicit output get <input name>_<job id>/ as their output folder."
+    )
+    parser.add_argument(
+        "-j", "--max-jobs", type=int, default=daemon_config["max_concurrent_jobs"],
+        help="Maximum number of jobs packaged at the same time."
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="Enable verbose debug logging."
+    )
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    daemon = PackagingDaemon(args.output_root, args.max_jobs, args.inbox, daemon_config["poll_interval"])
+    daemon.start()
+    DaemonRequestHandler.daemon = daemon
+    server = ThreadingHTTPServer((args.host, args.port), DaemonRequestHandler)
+    server.daemon_threads = True
+    logging.info(f"🚀 V2HLS daemon listening on http://{args.host}:{args.port} ({daemon.max_concurrent_jobs} concurrent job(s))")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Shutting down daemon.")
+    finally:
+        server.server_close()
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "validate":
+        validate_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Advanced Video to HLS Converter with multi-audio/subs, adaptive bitrate, and GitHub Pages deployment.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    parser.add_argument("input", type=Path, help="Input video file path.")
+    parser.add_argument("input", type=str, help="Input video file path, '-' for stdin, a named pipe, or an HTTP(S) URL (streamed without local staging).")
     parser.add_argument("output", type=Path, help="Output directory for HLS files.")
     
     parser.add_argument(
@@ -664,6 +1913,10 @@ def main():
         "--thumbnail-time", type=str, default="00:00:05",
         help="Timestamp for thumbnail generation (e.g., 00:00:05 or 5 for 5 seconds)."
     )
+    parser.add_argument(
+        "--validate", action="store_true",
+        help="Validate the generated package before deployment (see also: main.py validate <output>)."
+    )
     
     # Deployment arguments
     deploy_group = parser.add_argument_group('GitHub Deployment Options')
@@ -695,7 +1948,7 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    create_hls_package(
+    packaged = create_hls_package(
         input_file=args.input,
         output_dir=args.output,
         segment_duration=args.segment_duration,
@@ -707,8 +1960,11 @@ def main():
         github_username=args.gh_user,
         github_repo=args.gh_repo,
         github_token=args.gh_token,
-        github_branch=args.gh_branch
+        github_branch=args.gh_branch,
+        validate=args.validate
     )
+    if not packaged:
+        sys.exit(1)
     if args.archive or APP_CONFIG["archive_deployment"]["enabled"]:
         deploy_to_internet_archive(
             folder_to_upload=args.output,